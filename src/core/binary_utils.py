@@ -1,60 +1,35 @@
 import struct
 import os
-import logging
 from datetime import datetime
 
-logger = logging.getLogger("wildlifetag_automator")
+# Fixed header fields (Offsets 4-59), decoded in a single call:
+# DeviceID (I), Sensor Name (16s), FWID (H), HWID (H), SampleRate, WinLen, WinRate,
+# Bitmask, Config0-3 (I). All Little Endian.
+_HEADER_STRUCT = struct.Struct('<4xI16s2H8I')
 
-def bcd_to_int(byte_val):
-    """Helper: Converts a binary-coded decimal (BCD) byte to an integer."""
-    return (byte_val // 16) * 10 + (byte_val % 16)
+# BCD lookup table: BCD_LUT[byte] == (high nibble * 10) + low nibble
+BCD_LUT = bytes((b >> 4) * 10 + (b & 0x0F) for b in range(256))
 
-def read_vesper_header(filepath, header_size):
+def parse_vesper_header_bytes(header, filepath):
     """
-    Reads a dynamic sized Vesper header.
+    Decodes Vesper header bytes already in memory (e.g. a slice of a mapped file).
+    filepath is only used for the modification-time fallback of an invalid BCD date.
     Returns a dictionary with raw common fields (IDs, SampleRate, Time, Configs).
     """
-    #HEADER_SIZE = 150
-    if not os.path.exists(filepath):
-        return None
-
-    with open(filepath, 'rb') as f:
-        header = f.read(header_size)
-
-    # 1. Decode IDs
-    device_id = struct.unpack('<I', header[4:8])[0]
+    # 1-3. Decode IDs, Basic Configs (Offsets 4-43) and Extended Configs (Offsets 44-59)
+    (device_id, sensor_raw, fwid, hwid, sample_rate, win_len, win_rate,
+     bitmask, config0, config1, config2, config3) = _HEADER_STRUCT.unpack_from(header)
     try:
-        sensor_name = header[8:24].split(b'\x00')[0].decode('ascii')
+        sensor_name = sensor_raw.split(b'\x00')[0].decode('ascii')
     except:
         sensor_name = "Unknown"
 
-    # 2. Decode Basic Configs
-    fwid = struct.unpack('<H', header[24:26])[0]  # <H = unsigned short (2 bytes)
-    hwid = struct.unpack('<H', header[26:28])[0]
-
-    sample_rate = struct.unpack('<I', header[28:32])[0]
-
-    win_len = struct.unpack('<I', header[32:36])[0]
-    win_rate = struct.unpack('<I', header[36:40])[0]
-
-    bitmask = struct.unpack('<I', header[40:44])[0]
-
-    # 3. Decode Extended Configs (Offsets 44, 48, 52, 56)
-    # We read 4 unsigned integers (I) in Little Endian (<)
-    config0 = struct.unpack('<I', header[44:48])[0]
-    config1 = struct.unpack('<I', header[48:52])[0]
-    config2 = struct.unpack('<I', header[52:56])[0]
-    config3 = struct.unpack('<I', header[56:60])[0]
-
     # 4. Decode BCD Timestamp
+    # All 8 bytes (Offsets 132-139) decoded in one C-level pass through the lookup table:
+    # Hour, Min, Sec, Pad | Pad, Month, Day, Year
+    h, m, s, _, _, month, day, yy = header[132:140].translate(BCD_LUT)
     try:
-        h = bcd_to_int(header[132])
-        m = bcd_to_int(header[133])
-        s = bcd_to_int(header[134])
-        month = bcd_to_int(header[137])
-        day   = bcd_to_int(header[138])
-        year  = 2000 + bcd_to_int(header[139])
-        start_dt = datetime(year, month, day, h, m, s)
+        start_dt = datetime(2000 + yy, month, day, h, m, s)
     except ValueError:
         start_dt = datetime.fromtimestamp(os.path.getmtime(filepath))
 
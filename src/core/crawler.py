@@ -1,11 +1,65 @@
 import os
-import logging
+from concurrent.futures import ThreadPoolExecutor
+from src.core.logger import logger
 
-logger = logging.getLogger("wildlifetag_automator")
+# Folder names used by the tags themselves, resolved with one dict lookup
+_EXACT_KINDS = {"gps": "gps", "aud": "aud", "audio": "aud", "imu": "imu"}
 
-def find_raw_files(root_folder):
+def _sensor_kind(name):
+    """Maps a folder (or file) name to its sensor type ('gps', 'aud', 'imu') or None."""
+    name = name.lower()
+    kind = _EXACT_KINDS.get(name)
+    if kind is not None:
+        return kind
+
+    # Fallback: substring match, e.g. 'GPS_backup', 'vesper_imu', 'AUD00.BIN'
+    if "gps" in name:
+        return "gps"
+    if "aud" in name:
+        return "aud"
+    if "imu" in name:
+        return "imu"
+    return None
+
+# When several names on a path match, the strongest kind wins (gps > aud > imu),
+# e.g. 'AUD/imu/f.BIN' is audio, as with the old substring test over the whole path
+_KIND_PRIORITY = {"gps": 0, "aud": 1, "imu": 2}
+
+def _stronger_kind(kind, other):
+    """Returns the higher-priority of two sensor kinds (either may be None)."""
+    if kind is None:
+        return other
+    if other is None or _KIND_PRIORITY[kind] <= _KIND_PRIORITY[other]:
+        return kind
+    return other
+
+def _list_dir(folder):
+    """
+    Reads a single directory with os.scandir (file/dir checks reuse the type info from the read).
+    Returns (subdirs, bin_files): sub-folder entries and (name, path) pairs of the .BIN files in it.
+    """
+    subdirs = []
+    bin_files = []
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                name = entry.name
+                # Hidden entries: macOS AppleDouble ('._X.BIN'), .Trashes, .Spotlight-V100 on SD cards
+                if name[0] == '.':
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry)
+                elif name[-4:].upper() == ".BIN" and entry.is_file(follow_symlinks=False):
+                    bin_files.append((name, entry.path))
+    except OSError as e:
+        logger.warning(f"Could not read directory {folder}: {e}")
+
+    return subdirs, bin_files
+
+def find_raw_files(root_folder, workers=8):
     """
     Scans root_folder to find all .BIN files, organized by Tag/Session.
+    Up to `workers` directories are read concurrently.
     
     Returns:
         dict: {
@@ -20,52 +74,49 @@ def find_raw_files(root_folder):
         logger.error(f"Raw data folder not found: {root_folder}")
         return {}
 
-    # Structure: { "session_name": { "gps": [], "aud": [], "imu": [] } }
-    sessions_map = {}
-
     # 1. Identify Session Folders (Direct children of 'raw')
     try:
         # Get immediate subdirectories (the tags/sessions)
-        session_dirs = [d for d in os.listdir(root_folder) if os.path.isdir(os.path.join(root_folder, d))]
+        with os.scandir(root_folder) as it:
+            # Hidden folders (.Trashes, .Spotlight-V100) are skipped, as in _list_dir
+            session_dirs = [e.name for e in it if e.name[0] != '.' and e.is_dir(follow_symlinks=False)]
     except Exception as e:
         logger.error(f"Error reading directory structure: {e}")
         return {}
 
+    sessions_map = {session: {"gps": [], "aud": [], "imu": []} for session in session_dirs}
     total_files = 0
 
-    for session in session_dirs:
-        session_path = os.path.join(root_folder, session)
-        
-        # Initialize map for this specific tag
-        sessions_map[session] = {
-            "gps": [],
-            "aud": [],
-            "imu": []
-        }
-        
-        # 2. Walk ONLY inside this session folder
-        for dirpath, _, filenames in os.walk(session_path):
-            for filename in filenames:
-                if filename.upper().endswith(".BIN"):
-                    full_path = os.path.join(dirpath, filename)
-                    lower_path = full_path.lower()
-                    
-                    # Sort by sensor type
-                    if "gps" in lower_path:
-                        sessions_map[session]["gps"].append(full_path)
-                    elif "aud" in lower_path:
-                        sessions_map[session]["aud"].append(full_path)
-                    elif "imu" in lower_path:
-                        sessions_map[session]["imu"].append(full_path)
+    # 2. Walk ONLY inside each session folder
+    # Directory reads are I/O-latency bound (USB docks, network shares), so the tree is
+    # walked breadth-first: every folder of the current depth (across all sessions) is
+    # read concurrently on threads. The sensor type is decided once per directory from
+    # its name and inherited by sub-folders (the session folder's own name included).
+    level = [(session, os.path.join(root_folder, session), _sensor_kind(session)) for session in session_dirs]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while level:
+            listings = executor.map(_list_dir, [folder for _, folder, _ in level])
+            next_level = []
+
+            for (session, _, kind), (subdirs, bin_files) in zip(level, listings):
+                files_map = sessions_map[session]
+                for name, full_path in bin_files:
+                    # Sort by sensor type (folder names and the file name, strongest kind wins)
+                    file_kind = _stronger_kind(kind, _sensor_kind(name))
+                    if file_kind is not None:
+                        files_map[file_kind].append(full_path)
                     else:
-                        logger.warning("WARNING: SENSOR TYPE NOT FOUND")
-                        pass
-                    
+                        logger.warning(f"WARNING: SENSOR TYPE NOT FOUND: {full_path}")
                     total_files += 1
 
-        # Log stats for this specific tag
-        s_counts = sessions_map[session]
-        logger.info(f"Found Tag '{session}': {len(s_counts['gps'])} GPS, {len(s_counts['aud'])} Audio, {len(s_counts['imu'])} IMU")
+                for subdir in subdirs:
+                    next_level.append((session, subdir.path, _stronger_kind(kind, _sensor_kind(subdir.name))))
+
+            level = next_level
+
+    # Log stats for each specific tag
+    for session, files_map in sessions_map.items():
+        logger.info(f"Found Tag '{session}': {len(files_map['gps'])} GPS, {len(files_map['aud'])} Audio, {len(files_map['imu'])} IMU")
 
     logger.info(f"Scan complete. Found {total_files} files across {len(sessions_map)} tags.")
     return sessions_map
\ No newline at end of file
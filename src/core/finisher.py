@@ -1,18 +1,251 @@
 import os
-import logging
-import pandas as pd
-from scipy.io import wavfile
+import struct
+import tempfile
+import numpy as np
 from datetime import timedelta
+from src.core.fs_utils import ensure_dir
+from src.core.logger import logger
 
-logger = logging.getLogger("wildlifetag_automator")
+# Optional: pyarrow's C++ CSV writer is several times faster than pandas' to_csv,
+# but formats numbers differently (e.g. 0 vs 0.0, 0.00001 vs 1e-05), so it is opt-in
+# (config: imu_csv_engine). Parquet output always needs it.
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
+# Large write buffer for bulk outputs (CSV/WAV): avoids many small write syscalls
+WRITE_BUFFER_SIZE = 1 << 20  # 1 MiB
+
+def _format_time_column(times):
+    """
+    Formats a datetime Series as 'DD/MM/YYYY HH:MM:SS.mmm' strings.
+    Digits are derived with integer arithmetic on NumPy arrays and written into a
+    fixed-width byte buffer, instead of running strftime on every row.
+    """
+    # Milliseconds since epoch (int64), then split into time-of-day fields
+    ms = times.values.astype('datetime64[ms]').view('i8')
+    ms_of_day = ms % 86_400_000
+    dt = times.dt  # Build the accessor once
+    fields = (
+        (0, dt.day.values, 2),
+        (3, dt.month.values, 2),
+        (6, dt.year.values, 4),
+        (11, ms_of_day // 3_600_000, 2),
+        (14, ms_of_day // 60_000 % 60, 2),
+        (17, ms_of_day // 1000 % 60, 2),
+        (20, ms_of_day % 1000, 3),
+    )
+
+    # One row of 23 ASCII characters per timestamp
+    buf = np.empty((len(ms), 23), dtype=np.uint8)
+    buf[:, [2, 5]] = ord('/')
+    buf[:, 10] = ord(' ')
+    buf[:, [13, 16]] = ord(':')
+    buf[:, 19] = ord('.')
+    for start, values, width in fields:
+        for i in range(width):
+            buf[:, start + width - 1 - i] = ord('0') + (values // 10**i) % 10
+
+    return buf.view('S23').ravel().astype(str)
+
+# Sample formats the RIFF writer handles directly (Little Endian integer PCM)
+_PCM_DTYPES = ('<i2', '<i4', '|u1')
+
+def _write_pcm_wav(output_path, sample_rate, audio_data):
+    """
+    Writes integer PCM audio as a canonical 44-byte RIFF/WAVE file.
+    The samples are streamed straight from the NumPy buffer (no tobytes() copy).
+    """
+    n_channels = 1 if audio_data.ndim == 1 else audio_data.shape[1]
+    sample_width = audio_data.dtype.itemsize
+    block_align = n_channels * sample_width
+    n_bytes = audio_data.nbytes
+
+    header = b''.join((
+        b'RIFF', struct.pack('<I', 36 + n_bytes), b'WAVE',
+        b'fmt ', struct.pack('<IHHIIHH', 16, 1, n_channels, sample_rate,
+                             sample_rate * block_align, block_align, sample_width * 8),
+        b'data', struct.pack('<I', n_bytes),
+    ))
+
+    with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(header)
+        audio_data.tofile(f)
+
+def _imu_filename(start_dt, end_dt, uid, extension):
+    """Builds the session output name 'START-END_UID<extension>' from the first/last IMU timestamps."""
+    # Filename format: YYYYMMDD_HHMMSS (Standard sorting)
+    time_fmt_file = "%Y%m%d_%H%M%S"
+    return f"{start_dt.strftime(time_fmt_file)}-{end_dt.strftime(time_fmt_file)}_{uid}{extension}"
+
+# IMU output formats written by ImuSessionWriter, with their file extensions
+IMU_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet"}
+
+class ImuSessionWriter:
+    """
+    Streams the IMU DataFrames of one session (in time order) to temporary files
+    in the imu folder, one frame at a time, so the session is never held in memory.
+    The final 'START-END_UID' names are only known after the last frame:
+    close() renames the temporary files, abort() deletes them.
+    """
+    def __init__(self, imu_dir, formats=("csv",), csv_engine="pandas"):
+        self.imu_dir = imu_dir
+        self.csv_engine = csv_engine
+        self.start_time = None
+        self.end_time = None
+        self.rows = 0
+        self._tmp_paths = {} # format -> temporary path
+        self._csv_file = None
+        self._parquet_writer = None
+
+        try:
+            for fmt in formats:
+                if fmt == "parquet" and pa is None:
+                    logger.error("Parquet output requires pyarrow (pip install pyarrow).")
+                    continue
+                fd, tmp_path = tempfile.mkstemp(prefix="~imu_", suffix=IMU_EXTENSIONS[fmt] + ".tmp", dir=imu_dir)
+                self._tmp_paths[fmt] = tmp_path
+                if fmt == "csv":
+                    self._csv_file = open(fd, 'wb', buffering=WRITE_BUFFER_SIZE)
+                else:
+                    # The ParquetWriter opens the path itself, once the first schema is known
+                    os.close(fd)
+        except Exception:
+            # Don't leave the temporary files of the formats already created
+            self.abort()
+            raise
+
+    def write(self, frame):
+        """Appends one DataFrame (already sorted, later than the previous one) to every output."""
+        if frame is None or frame.empty:
+            return
+
+        if self._csv_file is not None:
+            try:
+                self._write_csv(frame)
+            except Exception as e:
+                logger.error(f"Failed to save CSV {self._tmp_paths['csv']}: {e}")
+                self._discard("csv")
+
+        if "parquet" in self._tmp_paths:
+            try:
+                self._write_parquet(frame)
+            except Exception as e:
+                logger.error(f"Failed to save Parquet {self._tmp_paths['parquet']}: {e}")
+                self._discard("parquet")
+
+        if self.start_time is None:
+            self.start_time = frame['Time'].iloc[0]
+        self.end_time = frame['Time'].iloc[-1]
+        self.rows += len(frame)
+
+    def _write_csv(self, frame):
+        # --- FORMAT TIME COLUMN --- (Optional: Match DD/MM/YYYY format)
+        # Format: 18/09/2025 07:37:30.696
+        # Shallow copy: the sensor columns are shared, not duplicated. Replacing the
+        # Time column only affects df_export, never the caller's DataFrame.
+        df_export = frame.copy(deep=False)
+        df_export['Time'] = _format_time_column(frame['Time'])
+
+        # Writer fixed by the configuration (never by session size), so every CSV of a
+        # run shares the same number formatting
+        f = self._csv_file
+        first = self.rows == 0
+        if self.csv_engine == "pyarrow":
+            # Header is written by hand so it stays unquoted (pyarrow quotes column names)
+            table = pa.Table.from_pandas(df_export, preserve_index=False)
+            if first:
+                f.write((",".join(df_export.columns) + "\n").encode())
+            pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(include_header=False, delimiter=',', quoting_style='none'))
+        else:
+            df_export.to_csv(f, index=False, sep=',', header=first)
+
+    def _write_parquet(self, frame):
+        # Each frame becomes a row group; Time is kept as a native timestamp column
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self._parquet_writer is None:
+            import pyarrow.parquet as pq
+            self._parquet_writer = pq.ParquetWriter(self._tmp_paths["parquet"], table.schema, compression='zstd')
+        self._parquet_writer.write_table(table)
+
+    def _close_outputs(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def _discard(self, fmt):
+        # Drops one output after a write error (the other format keeps going)
+        if fmt == "csv" and self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+        if fmt == "parquet" and self._parquet_writer is not None:
+            try:
+                self._parquet_writer.close()
+            except Exception:
+                pass
+            self._parquet_writer = None
+        tmp_path = self._tmp_paths.pop(fmt, None)
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    def close(self, uid=None):
+        """
+        Finishes the outputs and renames them to 'START-END_UID<ext>'.
+        Returns True if at least one output was saved.
+        """
+        success = False
+        try:
+            self._close_outputs()
+        except Exception as e:
+            logger.error(f"Failed to finish IMU outputs: {e}")
+            self.abort()
+            return False
+
+        labels = {"csv": "CSV", "parquet": "Parquet"}
+        for fmt, tmp_path in list(self._tmp_paths.items()):
+            if self.rows == 0:
+                self._discard(fmt)
+                continue
+            new_filename = _imu_filename(self.start_time, self.end_time, uid, IMU_EXTENSIONS[fmt])
+            output_path = os.path.join(self.imu_dir, new_filename)
+            try:
+                os.replace(tmp_path, output_path)
+                del self._tmp_paths[fmt]
+                logger.info(f"Saved IMU {labels[fmt]}: {new_filename}")
+                success = True
+            except Exception as e:
+                logger.error(f"Failed to save {labels[fmt]} {output_path}: {e}")
+                self._discard(fmt)
+        return success
+
+    def abort(self):
+        """Closes and deletes the temporary outputs (nothing is saved)."""
+        for fmt in list(self._tmp_paths):
+            try:
+                self._discard(fmt)
+            except Exception as e:
+                logger.error(f"Failed to remove temporary IMU output: {e}")
+
+# IMU CSV writers: 'pandas' (to_csv, legacy number formatting) or 'pyarrow' (faster)
+CSV_ENGINES = ("pandas", "pyarrow")
 
 class FileFinisher:
-    def __init__(self, processed_root):
+    def __init__(self, processed_root, csv_engine="pandas"):
         """
         Initialize with the root folder where organized data should go.
         e.g., ./data/processed/
+        csv_engine selects the IMU CSV writer (see CSV_ENGINES); 'pandas' is the default.
         """
         self.processed_root = processed_root
+        self.csv_engine = csv_engine
+        if csv_engine == "pyarrow" and pa is None:
+            logger.warning("imu_csv_engine 'pyarrow' requires pyarrow (pip install pyarrow), using pandas.")
+            self.csv_engine = "pandas"
         self.structure = {
             "gps": os.path.join(processed_root, "gps"),
             "imu": os.path.join(processed_root, "imu"),
@@ -21,13 +254,25 @@ class FileFinisher:
         
         # Create output directories if they don't exist
         for path in self.structure.values():
-            os.makedirs(path, exist_ok=True)
+            ensure_dir(path)
+
+        # Sidecar .txt folders per sensor, created once here instead of on every metadata write
+        self._meta_dirs = {
+            "IMU10": os.path.join(self.structure["imu"], "metadata"),
+            "SPH0641": os.path.join(self.structure["aud"], "metadata")
+        }
+        for path in self._meta_dirs.values():
+            ensure_dir(path)
 
     def generate_metadata_file(self, meta, end_time=None, time_stamps = None):
         """
         Generates the sidecar .txt file
         Formats Configs and Bitmask as Hexadecimal to match Vesper output.
         """
+        # Logic to define the specific 'metadata' subfolder path (cheap check first)
+        meta_dir = self._meta_dirs.get(meta['Sensor'])
+        if meta_dir is None:
+            return
 
         # --- Construct Filename and Path ---
         try:                                                        
@@ -47,91 +292,82 @@ class FileFinisher:
             logger.error(f"Metadata error: Start_Time missing.")   
             return                                                 
         
-        # Logic to define the specific 'metadata' subfolder path        
-        if meta['Sensor'] == "IMU10":
-            meta_dir = os.path.join(self.structure["imu"], "metadata") 
-        elif meta['Sensor'] == "SPH0641":
-            meta_dir = os.path.join(self.structure["aud"], "metadata") 
-        else:
-            return
-
-        # This line ensures 'imu/metadata' exists before we try to save a file into it.
-        os.makedirs(meta_dir, exist_ok=True)
-
         txt_path = os.path.join(meta_dir, txt_filename)
 
         if os.path.exists(txt_path):
             return
         
-        lines = [
-            f"DeviceID:{meta['DeviceID']:X}" if isinstance(meta['DeviceID'], int) else f"DeviceID:{meta['DeviceID']}",
-            f"HWID:{meta['HWID']:X}",
-            f"FWID:{meta['FWID']:X}",
-            f"Sensor:{meta['Sensor']}",
-            f"SampleRate:{meta['SampleRate']}",
-            f"WinRate:{meta['WinRate']}",
-            f"WinLen:{meta['WinLen']}",
-            # Use :X to format as Uppercase Hex (e.g., 10 -> A)
-            f"Config0:{meta['Config0']:X}",
-            f"Config1:{meta['Config1']:X}",
-            f"Config2:{meta['Config2']:X}",
-            f"Config3:{meta['Config3']:X}",
+        device_id = meta['DeviceID']
+        if isinstance(device_id, int):
+            device_id = f"{device_id:X}"
+
+        # One template for the whole block
+        # Use :X to format as Uppercase Hex (e.g., 10 -> A)
+        content = (
+            f"DeviceID:{device_id}\n"
+            f"HWID:{meta['HWID']:X}\n"
+            f"FWID:{meta['FWID']:X}\n"
+            f"Sensor:{meta['Sensor']}\n"
+            f"SampleRate:{meta['SampleRate']}\n"
+            f"WinRate:{meta['WinRate']}\n"
+            f"WinLen:{meta['WinLen']}\n"
+            f"Config0:{meta['Config0']:X}\n"
+            f"Config1:{meta['Config1']:X}\n"
+            f"Config2:{meta['Config2']:X}\n"
+            f"Config3:{meta['Config3']:X}\n"
             f"Bitmask:{meta['Bitmask']:X}"
-        ]
+        )
         
         # Append Audio Drift Timestamps (If present) ---
         if time_stamps and isinstance(time_stamps, list) and len(time_stamps) > 0:
-            lines.append("") # Empty line for separation
-            lines.append("=== EMBEDDED BLOCK TIMESTAMPS (Audio Drift Check) ===")
-            for i, ts in enumerate(time_stamps):
-                lines.append(f"Block_{i+1}: {ts}")
+            # Empty line for separation
+            content += "\n\n=== EMBEDDED BLOCK TIMESTAMPS (Audio Drift Check) ===\n"
+            content += "\n".join(f"Block_{i}: {ts}" for i, ts in enumerate(time_stamps, 1))
 
         try:
             with open(txt_path, 'w') as f:
-                f.write("\n".join(lines))
+                f.write(content)
         except Exception as e:
             logger.error(f"Failed to write metadata txt: {e}")
 
-    def save_imu_csv(self, dataframe, uid=None):
+    def open_imu_session(self, formats=("csv",)):
         """
-        Saves the IMU DataFrame.
-        Assumes the Parser has already structured the columns correctly.
+        Returns an ImuSessionWriter for one session: feed it the session's DataFrames
+        in time order with write(), then close(uid) (or abort() on failure).
+        formats is any of 'csv' / 'parquet'.
         """
+        return ImuSessionWriter(self.structure["imu"], formats, self.csv_engine)
+
+    def _save_imu(self, dataframe, uid, fmt):
         if dataframe is None or dataframe.empty:
             return False
 
-        output_path = None
         try:
-            # --- GENERATE FILENAME ---
-            # The 'Time' column is a DatetimeIndex or Series of datetimes
-            start_dt = dataframe['Time'].iloc[0]
-            end_dt = dataframe['Time'].iloc[-1]
-            
-            # Filename format: YYYYMMDD_HHMMSS (Standard sorting)
-            time_fmt_file = "%Y%m%d_%H%M%S"
-            new_filename = f"{start_dt.strftime(time_fmt_file)}-{end_dt.strftime(time_fmt_file)}_{uid}.csv"
-            output_path = os.path.join(self.structure["imu"], new_filename)
-
-            # --- FORMAT TIME COLUMN --- (Optional: Match DD/MM/YYYY format)
-            # We create a copy so we don't mess up the original data if used elsewhere
-            df_export = dataframe.copy()
-            
-            # Format: 18/09/2025 07:37:30.696
-            # Faster vectorized approach
-            time_str = df_export['Time'].dt.strftime('%d/%m/%Y %H:%M:%S')
-            ms_str = (df_export['Time'].dt.microsecond // 1000).astype(str).str.zfill(3)
-            df_export['Time'] = time_str + '.' + ms_str
-
-            # --- SAVE ---
-            df_export.to_csv(output_path, index=False, sep=',') 
-            
-            logger.info(f"Saved IMU CSV: {new_filename}")
-            return True
-
+            writer = self.open_imu_session((fmt,))
         except Exception as e:
-            logger.error(f"Failed to save CSV {output_path if output_path else 'Unknown'}: {e}")
+            logger.error(f"Failed to save IMU {fmt} in {self.structure['imu']}: {e}")
             return False
+
+        try:
+            writer.write(dataframe)
+            return writer.close(uid)
+        finally:
+            writer.abort()
+
+    def save_imu_csv(self, dataframe, uid=None):
+        """
+        Saves the IMU DataFrame.
+        Assumes the Parser has already structured the columns correctly.
+        """
+        return self._save_imu(dataframe, uid, "csv")
         
+    def save_imu_parquet(self, dataframe, uid=None):
+        """
+        Saves the IMU data as Parquet (zstd compressed), next to where the CSV would go.
+        Time is kept as a native timestamp column. Requires pyarrow.
+        """
+        return self._save_imu(dataframe, uid, "parquet")
+
     def save_aud_wav(self, audio_data, meta):
         """
         Saves the Audio_data to .WAV with a timestamped filename.
@@ -141,6 +377,12 @@ class FileFinisher:
         """
         if audio_data is not None and len(audio_data) > 0:
             
+            # The writers stream straight from the array buffer; a strided view would
+            # force a hidden element-by-element write (or a copy inside scipy)
+            if not audio_data.flags.c_contiguous:
+                logger.warning("Audio buffer is not contiguous, copying before WAV write.")
+                audio_data = np.ascontiguousarray(audio_data)
+
             output_path = None
             try:
                 # ---Calculate Duration and then End Time stamp---
@@ -160,7 +402,13 @@ class FileFinisher:
                 output_path = os.path.join(self.structure["aud"], new_filename)
 
                 # ---Save to WAV---
-                wavfile.write(output_path, meta['SampleRate'], audio_data) 
+                if audio_data.dtype.str in _PCM_DTYPES:
+                    _write_pcm_wav(output_path, meta['SampleRate'], audio_data)
+                else:
+                    # Float / big-endian data: let scipy handle the format details
+                    # (imported here, scipy is slow to import and rarely needed)
+                    from scipy.io import wavfile
+                    wavfile.write(output_path, meta['SampleRate'], audio_data)
 
                 logger.info(f"Saved Audio WAV: {new_filename}")
                 return True
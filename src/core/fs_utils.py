@@ -0,0 +1,14 @@
+import os
+
+# Directories already created (or confirmed to exist) by this process
+_MADE_DIRS = set()
+
+def ensure_dir(path):
+    """
+    Creates path (and parents) if needed. Each directory is only checked once per process,
+    later calls are a set lookup instead of a makedirs/stat round trip.
+    """
+    if path not in _MADE_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _MADE_DIRS.add(path)
+    return path
@@ -1,9 +1,15 @@
 import logging
+import logging.handlers
+import multiprocessing
 import os
 import sys
 from datetime import datetime
 from tqdm import tqdm
 
+# Single application logger, shared by every module (import it, don't re-create it)
+LOGGER_NAME = "wildlifetag_automator"
+logger = logging.getLogger(LOGGER_NAME)
+
 class TqdmLoggingHandler(logging.Handler):
     """
     Costum logging handler that uses tqdm.write to 
@@ -36,8 +42,11 @@ def setup_logger(name, log_dir="."):
     log_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
 
     # File handler (writes to disk)
+    # Records are buffered in memory and written in batches of 512; WARNING and above
+    # flush immediately so problems are always on disk. The rest is flushed on exit.
     file_handler = logging.FileHandler(log_file)
     file_handler.setFormatter(log_formatter)
+    buffered_file_handler = logging.handlers.MemoryHandler(capacity=512, flushLevel=logging.WARNING, target=file_handler)
 
     # TQDM console handler (writes to terminal safely)
     console_handler = TqdmLoggingHandler()
@@ -47,7 +56,27 @@ def setup_logger(name, log_dir="."):
     logger.setLevel(logging.INFO)
 
     if not logger.handlers:
-        logger.addHandler(file_handler)
+        logger.addHandler(buffered_file_handler)
         logger.addHandler(console_handler)
 
-    return logger
\ No newline at end of file
+    return logger
+
+def start_worker_log_listener(logger):
+    """
+    Starts a background listener that forwards log records coming from worker
+    processes to the handlers of the given (main process) logger.
+    Returns (log_queue, listener). Call listener.stop() when the workers are done.
+    """
+    log_queue = multiprocessing.Queue()
+    listener = logging.handlers.QueueListener(log_queue, *logger.handlers, respect_handler_level=True)
+    listener.start()
+    return log_queue, listener
+
+def setup_worker_logger(log_queue):
+    """
+    Process pool initializer: routes the worker's log records to the main
+    process through log_queue, so they land in the same console/log file.
+    """
+    worker_logger = logging.getLogger(LOGGER_NAME)
+    worker_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    worker_logger.setLevel(logging.INFO)
@@ -1,97 +1,172 @@
 import yaml
+import json
+import logging
 import os
 import sys
 import traceback
-import pandas as pd
+import multiprocessing
 import re
 
 from tqdm import tqdm
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from itertools import islice
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from src.core.logger import setup_logger
+from src.core.logger import setup_logger, start_worker_log_listener, setup_worker_logger, LOGGER_NAME, TqdmLoggingHandler
 from src.core.crawler import find_raw_files
-from src.parsers.imu_parser import parse_imu_file
+from src.core.fs_utils import ensure_dir
+from src.parsers.imu_parser import parse_imu_file, read_imu_time_range
 from src.parsers.audio_parser import parse_audio_file
-from src.parsers.gps_parser import parse_gps_file
+from src.parsers.gps_parser import parse_gps_file, gps_snapshot_name
 
-from src.core.finisher import FileFinisher
+from src.core.finisher import FileFinisher, CSV_ENGINES
+
+# libyaml's C loader when PyYAML was built with it, pure Python loader otherwise
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 
 
 def load_config(config_path="config.yaml"):
-    """Loads configuration from the YAML file"""
+    """
+    Loads configuration from the YAML file.
+    A parsed copy is cached as JSON next to it (config.yaml.cache.json), tagged with the
+    YAML file's mtime, and reused as long as that mtime is unchanged (skips the slow YAML parser).
+    """
     if not os.path.exists(config_path):
         raise FileNotFoundError(f"Config file not found at {config_path}")
 
+    config_mtime = os.path.getmtime(config_path)
+    cache_path = config_path + ".cache.json"
+    try:
+        with open(cache_path, "r") as f:
+            cache = json.load(f)
+        # Exact match: also catches a config replaced by an older copy (mtime going backwards)
+        if cache.get("mtime") == config_mtime:
+            return cache["config"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass # No cache yet (or unreadable/corrupt): parse the YAML
+
     with open(config_path, "r") as f:
-        return yaml.safe_load(f)
+        config = yaml.load(f, Loader=YamlLoader)
 
+    # Refresh the cache; a read-only install folder just skips it
+    try:
+        with open(cache_path, "w") as f:
+            json.dump({"mtime": config_mtime, "config": config}, f)
+    except (OSError, TypeError):
+        pass
+
+    return config
+
+
+@dataclass(slots=True)
+class RunStats:
+    """Counters for the final processing summary (one instance per run)."""
+    total: int = 0
+    total_imu: int = 0
+    total_aud: int = 0
+    total_gps: int = 0
+    success_imu: int = 0
+    success_aud: int = 0
+    success_gps: int = 0
+    failed_imu: int = 0
+    failed_aud: int = 0
+    failed_gps: int = 0
+    errors: list = field(default_factory=list) # List of dicts: {'file': name, 'reason': msg, 'exception': optional exception}
 
 def generate_summary(stats, logger, processed_folder):
     """
     Prints a summary table to the logs and writes a report file to disk after execution
     """
 
+    # One timestamp for both the report header and its filename
+    now = datetime.now()
+
     # Generate report content
-    lines = []
-    lines.append("="*40)
-    lines.append(f"WILDLIFETAG AUTOMATOR - PROCESSING SUMMARY")
-    lines.append(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    lines.append("="*40)
-    lines.append(f"Total Files Found: {stats['total']}")
-    lines.append("-"*40)
-    lines.append(f"Total IMU Files Found: {stats['total_imu']}")
-    lines.append(f"IMU Files Successfully Parsed: {stats['success_imu']}")
-    lines.append(f"IMU Files Failed / Skipped:  {stats['failed_imu']}")
-    lines.append("-"*40)
-    lines.append(f"Total AUD Files Found: {stats['total_aud']}")
-    lines.append(f"AUD Files Successfully Parsed: {stats['success_aud']}")
-    lines.append(f"AUD Files Failed / Skipped:  {stats['failed_aud']}")
-    lines.append("-"*40)
-    lines.append(f"Total GPS Files Found: {stats['total_gps']}")
-    lines.append(f"GPS Files Successfully Parsed: {stats['success_gps']}")
-    lines.append(f"GPS Files Failed / Skipped:  {stats['failed_gps']}")
+    lines = [
+        "="*40,
+        "WILDLIFETAG AUTOMATOR - PROCESSING SUMMARY",
+        f"Date: {now.strftime('%Y-%m-%d %H:%M:%S')}",
+        "="*40,
+        f"Total Files Found: {stats.total}",
+        "-"*40,
+        f"Total IMU Files Found: {stats.total_imu}",
+        f"IMU Files Successfully Parsed: {stats.success_imu}",
+        f"IMU Files Failed / Skipped:  {stats.failed_imu}",
+        "-"*40,
+        f"Total AUD Files Found: {stats.total_aud}",
+        f"AUD Files Successfully Parsed: {stats.success_aud}",
+        f"AUD Files Failed / Skipped:  {stats.failed_aud}",
+        "-"*40,
+        f"Total GPS Files Found: {stats.total_gps}",
+        f"GPS Files Successfully Parsed: {stats.success_gps}",
+        f"GPS Files Failed / Skipped:  {stats.failed_gps}",
+    ]
  
-    if stats['errors']:
-        logger.info("-"*40)
-        logger.info("FAILED FILES:")
-        for err in stats['errors']:
-            logger.info(f"  [X] {os.path.basename(err['file'])}  -> {err['reason']}")
-            
-    logger.info("="*40)
+    if stats.errors:
+        lines.append("-"*40)
+        lines.append("FAILED FILES:")
+        for err in stats.errors:
+            # Crash messages are only turned into text here, once, for the report
+            reason = err['reason'] if err.get('exception') is None else f"{err['reason']}: {err['exception']}"
+            lines.append(f"  [X] {os.path.basename(err['file'])}  -> {reason}")
 
-    report_content = "\n".join(lines)
+    lines.append("="*40)
 
-    # Print to logger(console)
-    for line in lines:
-        logger.info(line)
+    # Print to logger(console) in one record, and reuse the same text for the report file
+    report_content = "\n".join(lines)
+    logger.info("\n%s", report_content)
 
     # Write to a persistent text file
     # Save reports in a specific subfolder: data/processed/report_cards/
     reports_dir = os.path.join(processed_folder, "report_cards")
-    os.makedirs(reports_dir, exist_ok=True)
+    ensure_dir(reports_dir)
     
-    report_filename = f"processing_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    report_filename = f"processing_report_{now.strftime('%Y%m%d_%H%M%S')}.txt"
     report_path = os.path.join(reports_dir, report_filename)
     
     try:
-        with open(report_path, "w") as f:
+        # Write to a temp file and swap it in, so a killed run never leaves a half-written report
+        tmp_path = report_path + ".tmp"
+        with open(tmp_path, "w") as f:
             f.write(report_content)
+        os.replace(tmp_path, report_path)
         logger.info(f"\n[Report] Detailed summary saved to: {report_path}")
     except Exception as e:
         logger.error(f"Failed to write summary report file: {e}")
 
+# First run of digits in a filename (compiled once, used as a sort key)
+_FILE_NUMBER_RE = re.compile(r'\d+')
+
 def extract_file_number(filepath):
     """Helper to extract the first number from a filename for sorting."""
     # Find digits in the filename
-    match = re.search(r'(\d+)', os.path.basename(filepath))
+    match = _FILE_NUMBER_RE.search(os.path.basename(filepath))
     # Return the integer value if found, otherwise 0
-    return int(match.group(1)) if match else 0
+    return int(match.group()) if match else 0
 
-def main():
+def iter_pool_results(executor, func, items, window):
+    """
+    Submits func(item) to the executor for each item and yields (item, future) in input order.
+    At most `window` jobs are in flight: the next file is only submitted once an earlier
+    result has been handed out, so large results (audio buffers) don't pile up in memory.
+    """
+    items = iter(items)
+    pending = deque((item, executor.submit(func, item)) for item in islice(items, window))
+    while pending:
+        item, future = pending.popleft()
+        # Keep the pool busy while the caller handles this result
+        for next_item in islice(items, 1):
+            pending.append((next_item, executor.submit(func, next_item)))
+        yield item, future
 
-    pd.set_option('display.max_columns', None)
+def main():
 
     # Setup Logging
-    logger = setup_logger("wildlifetag_automator", log_dir="./logs")
+    logger = setup_logger(LOGGER_NAME, log_dir="./logs")
     logger.info("--- WildlifeTag Automator Started ---")
 
     # Load Config
@@ -99,199 +174,301 @@ def main():
         config = load_config()
         logger.info("Configuration loaded successfully.")
     except Exception as e:
-        logger.error(f"Failed to load config: {e}")
+        logger.error("Failed to load config: %s", e)
         return
     
     # Setup Paths & Objects 
     raw_folder = config.get("raw_data_folder", "./data/raw")
     processed_folder = config.get("processed_folder", "./data/processed")
-    finisher = FileFinisher(processed_folder)
+
+    imu_output_format = str(config.get("imu_output_format", "csv")).lower()
+    if imu_output_format not in ("csv", "parquet", "both"):
+        logger.warning("Unknown imu_output_format '%s', using csv.", imu_output_format)
+        imu_output_format = "csv"
+
+    imu_csv_engine = str(config.get("imu_csv_engine", "pandas")).lower()
+    if imu_csv_engine not in CSV_ENGINES:
+        logger.warning("Unknown imu_csv_engine '%s', using pandas.", imu_csv_engine)
+        imu_csv_engine = "pandas"
+
+    finisher = FileFinisher(processed_folder, csv_engine=imu_csv_engine)
 
     # Crawl files
     all_sessions = find_raw_files(raw_folder)
 
     # Summary stats container
-    stats = {
-        "total": 0,
-        "total_imu": 0,
-        "total_aud": 0,
-        "total_gps": 0,
-        "success_imu": 0,
-        "success_aud": 0,
-        "success_gps": 0,
-        "failed_imu": 0,
-        "failed_aud": 0,
-        "failed_gps": 0,
-        "errors": [] # List of dicts: {'file': name, 'reason': msg}
-    }
-
-# --- MAIN LOOP: Iterate over each Tag/Session ---
-    for session_id, files_map in all_sessions.items():
-        logger.info(f"Processing Session: {session_id}")
-
-        # ==========================================
-        # 1. PROCESS IMU FILES (Merge into one CSV)
-        # ==========================================
-        imu_files = files_map['imu']
-        stats['total_imu'] += len(imu_files)
-        
-        imu_files.sort(key=extract_file_number)
-        imu_df = pd.DataFrame()
-        session_device_id = None
-        last_meta = None # Keep track of metadata for the .txt generator
+    stats = RunStats()
 
-        if imu_files:
-            logger.info(f"Starting IMU Parser on {len(imu_files)} files...")
-            
-            # Start tqdm loop (progress bar)
-            for filepath in tqdm(imu_files, desc=f"IMU ({session_id})", unit="file"):
+    # Worker pool: files are decoded in parallel (one process per CPU core),
+    # results are consumed here in file order. Worker logs are forwarded to our handlers.
+    log_queue, log_listener = start_worker_log_listener(logger)
+    max_workers = os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=max_workers,
+                                   initializer=setup_worker_logger, initargs=(log_queue,))
+
+    # GPS conversion is mostly file I/O (NumPy releases the GIL while reading/writing),
+    # so it runs on threads: no process start-up or pickling, and up to 16 files in flight
+    gps_executor = ThreadPoolExecutor(max_workers=16)
+
+    try:
+        # --- MAIN LOOP: Iterate over each Tag/Session ---
+        for session_id, files_map in all_sessions.items():
+            logger.info("Processing Session: %s", session_id)
+
+            # ==========================================
+            # 1. PROCESS IMU FILES (Merge into one CSV)
+            # ==========================================
+            imu_files = files_map['imu']
+            stats.total_imu += len(imu_files)
+        
+            imu_files.sort(key=extract_file_number)
+            session_device_id = None
+            last_meta = None # Keep track of metadata for the .txt generator
+
+            if imu_files:
+                logger.info("Starting IMU Parser on %d files...", len(imu_files))
+
+                # SAFETY NET: Ensure strict chronological order, the sorting is already done by ordering the filenames before the parsing.
+                # The time range of every file follows from its header and size, so overlaps are found before parsing.
+                # Without overlap the files are streamed to disk one by one (never merged in memory);
+                # only if two files overlap in time do we fall back to merging and sorting everything.
+                ranges = [r for r in map(read_imu_time_range, imu_files) if r is not None]
+                overlap = any(prev[1] > nxt[0] for prev, nxt in zip(ranges, ranges[1:]))
+                if overlap:
+                    logger.warning("IMU files of %s overlap in time, sorting the merged data.", session_id)
+
+                # ---Save CSV and/or Parquet (config: imu_output_format)---
+                imu_formats = ("csv", "parquet") if imu_output_format == "both" else (imu_output_format,)
+                imu_writer = None
+                frames = [] # Per-file DataFrames, only kept for the overlap fallback
+                success = False
+                start_time = end_time = None
                 try:
-                    df, meta = parse_imu_file(filepath)
-                    if df is not None and not df.empty:
-                        stats['success_imu'] += 1
+                    if not overlap:
+                        try:
+                            imu_writer = finisher.open_imu_session(imu_formats)
+                        except Exception as e:
+                            # Outputs can't be created (e.g. unwritable imu folder): the session is not saved
+                            logger.error("Failed to create IMU outputs for %s: %s", session_id, e)
+                            stats.errors.append({
+                                "file": session_id,
+                                "reason": "IMU outputs not saved",
+                                "exception": e
+                            })
+
+                    # Bounded window: parsed files waiting to be written are limited to the window,
+                    # not the whole session (collected in order, progress bar)
+                    imu_results = iter_pool_results(executor, parse_imu_file, imu_files, window=2 * max_workers)
+                    for filepath, future in tqdm(imu_results, total=len(imu_files), desc=f"IMU ({session_id})", unit="file"):
+                        try:
+                            df, meta = future.result()
+                            if df is not None and not df.empty:
+                                stats.success_imu += 1
                         
-                        # Concatenate to the session master dataframe
-                        imu_df = pd.concat([imu_df, df], ignore_index=True)
+                                # Each file is written in time order, so its rows are already sorted: an O(N)
+                                # check replaces the old unconditional sort, which only runs if the check fails
+                                if not df['Time'].is_monotonic_increasing:
+                                    logger.warning("IMU rows out of order in %s, sorting by Time.", os.path.basename(filepath))
+                                    df = df.sort_values(by='Time', ignore_index=True, kind='stable')
+
+                                # Stream into the session outputs (or collect for the overlap fallback)
+                                if imu_writer is not None:
+                                    imu_writer.write(df)
+                                elif overlap:
+                                    frames.append(df)
                         
-                        # Capture Device ID/Meta from the first valid file
-                        if session_device_id is None and meta:
-                            session_device_id = meta.get('DeviceID', 'UnknownTag')
-                            last_meta = meta
-                    else:
-                        stats['failed_imu'] += 1
-                        stats['errors'].append({
-                            "file": filepath, 
-                            "reason": "IMU Parser returned None or Empty DF"
-                        })
+                                # Capture Device ID/Meta from the first valid file
+                                if session_device_id is None and meta:
+                                    session_device_id = meta.get('DeviceID', 'UnknownTag')
+                                    last_meta = meta
+                            else:
+                                stats.failed_imu += 1
+                                stats.errors.append({
+                                    "file": filepath, 
+                                    "reason": "IMU Parser returned None or Empty DF"
+                                })
                         
-                except Exception as e:
-                    # Unexpected Crash (e.g., PermissionError, MemoryError)
-                    stats['failed_imu'] += 1
-                    stats['errors'].append({
-                        "file": filepath, 
-                        "reason": f"IMU Crash: {str(e)}"
-                    })
-                    logger.error(f"IMU Crash {os.path.basename(filepath)}: {e}")
+                        except Exception as e:
+                            # Unexpected Crash (e.g., PermissionError, MemoryError)
+                            stats.failed_imu += 1
+                            stats.errors.append({
+                                "file": filepath, 
+                                "reason": "IMU Crash",
+                                "exception": e
+                            })
+                            logger.error("IMU Crash %s: %s", os.path.basename(filepath), e)
+                        df = None
         
-            # Save the merged CSV for this specific tag
-            if not imu_df.empty:
-                # SAFETY NET: Ensure strict chronological order, the sorting is already done by ordering the filenames before the parsing but this is best practice
-                imu_df = imu_df.sort_values(by='Time')
-
-                # --- Extract Precise Start/End Times from Data ---
-                start_time = imu_df['Time'].iloc[0]
-                end_time = imu_df['Time'].iloc[-1]
-                
-                # Update metadata to match the DataFrame exactly
-                if last_meta:
-                    last_meta['Start_Time'] = start_time
-
-                # ---Save CSV--- 
-                success = finisher.save_imu_csv(imu_df, uid=session_device_id)
-                
-                # Generate Metadata .txt
-                # We need to construct the path manually to match the CSV location or rely on finisher structure
+                    # Save the session outputs for this specific tag
+                    if imu_writer is not None:
+                        # --- Precise Start/End Times from the streamed data ---
+                        start_time, end_time = imu_writer.start_time, imu_writer.end_time
+                        success = imu_writer.close(uid=session_device_id)
+                    elif frames:
+                        # The merged data is a few already-sorted runs: a stable sort (radix/timsort for datetimes)
+                        # handles that in ~linear time and keeps equal timestamps in file order.
+                        import pandas as pd
+                        merged = pd.concat(frames, ignore_index=True).sort_values(by='Time', kind='stable')
+                        frames.clear()
+                        start_time = merged['Time'].iloc[0]
+                        end_time = merged['Time'].iloc[-1]
+                        if "csv" in imu_formats:
+                            success = finisher.save_imu_csv(merged, uid=session_device_id)
+                        if "parquet" in imu_formats:
+                            success = finisher.save_imu_parquet(merged, uid=session_device_id) or success
+                        merged = None
+                finally:
+                    # Temporary outputs of an interrupted session are removed
+                    if imu_writer is not None:
+                        imu_writer.abort()
+
+                # Generate Metadata .txt next to the outputs
                 if success and last_meta:
-                    # We create a dummy path that points to the output folder so the txt is saved next to the CSV
-                    # Or simpler: we use the finisher structure directly inside generate_metadata_file logic
+                    # Update metadata to match the data exactly
+                    last_meta['Start_Time'] = start_time
                     finisher.generate_metadata_file(last_meta, end_time=end_time)
-        else:
-            # No IMU files for this session
-            logger.warning("No IMU files found.")
-
-
-        # ==========================================
-        # 2. PROCESS AUDIO FILES
-        # ==========================================
-        audio_files = files_map['aud']
-        stats['total_aud'] += len(audio_files)
-
-        if audio_files:
-            logger.info(f"Starting Audio Parser on {len(audio_files)} files...")   
-
-            for filepath in tqdm(audio_files, desc=f"Audio ({session_id})", unit="file"):
-                try:
-                    # Construct output path: data/processed/audio/filename.wav
-                    #output_name = os.path.splitext(os.path.basename(filepath))[0] + ".wav"
-                    #output_path = os.path.join(processed_folder, "aud", output_name)
-                    
-                    # Ensure directory exists
-                    #os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-                    # Call parser (assuming signature: parse_audio_file(input, output))
-                    # Note: We need to verify if your parse_audio_file takes output_path or just input
-                    # Based on standard design, usually parser takes input and returns data/success.
-                    # I will assume we updated it to take output_path as per your snippet.
-
-                    success, meta, audio_data, timestamps = parse_audio_file(filepath)
-
-                    if success:
-                        stats['success_aud'] += 1
-
-                        # Calculate End Time
-                        end_time = None
-                        if audio_data is not None and len(audio_data) > 0 and meta:
-                            duration_seconds = len(audio_data) / meta['SampleRate']
-                            end_time = meta['Start_Time'] + timedelta(seconds=duration_seconds)
 
-                        # Generate Metadata
-                        if meta:
-                            finisher.generate_metadata_file(meta, end_time=end_time, time_stamps=timestamps)        
+                # Release this session's IMU data before the audio files are loaded
+                frames.clear()
+            else:
+                # No IMU files for this session
+                logger.warning("No IMU files found.")
+
+
+            # ==========================================
+            # 2. PROCESS AUDIO FILES
+            # ==========================================
+            audio_files = files_map['aud']
+            stats.total_aud += len(audio_files)
+
+            if audio_files:
+                logger.info("Starting Audio Parser on %d files...", len(audio_files))   
+
+                # Bounded window: each result holds a whole decoded file, the WAV for file N is
+                # written while the next files are being parsed
+                audio_results = iter_pool_results(executor, parse_audio_file, audio_files, window=2 * max_workers)
+                for filepath, future in tqdm(audio_results, total=len(audio_files), desc=f"Audio ({session_id})", unit="file"):
+                    try:
+                        # The WAV path is built by the finisher (aud/ folder is created once in FileFinisher)
+                        success, meta, audio_data, timestamps = future.result()
+
+                        if success:
+                            stats.success_aud += 1
+
+                            # Calculate End Time
+                            end_time = None
+                            if audio_data is not None and len(audio_data) > 0 and meta:
+                                duration_seconds = len(audio_data) / meta['SampleRate']
+                                end_time = meta['Start_Time'] + timedelta(seconds=duration_seconds)
+
+                            # Generate Metadata
+                            if meta:
+                                finisher.generate_metadata_file(meta, end_time=end_time, time_stamps=timestamps)        
                             
-                        # Save WAV
-                        if audio_data is not None and len(audio_data) > 0:
-                            finisher.save_aud_wav(audio_data, meta)
-
-                    else:
-                        stats['failed_aud'] += 1
-                        stats['errors'].append({
+                            # Save WAV
+                            if audio_data is not None and len(audio_data) > 0:
+                                finisher.save_aud_wav(audio_data, meta)
+
+                        else:
+                            stats.failed_aud += 1
+                            stats.errors.append({
+                                "file": filepath, 
+                                "reason": "AUDIO Parser returned None or Empty DF"
+                            })
+                            logger.warning("Audio parse failed for %s", filepath)
+
+                    except Exception as e:
+                        stats.failed_aud += 1
+                        stats.errors.append({
                             "file": filepath, 
-                            "reason": "AUDIO Parser returned None or Empty DF"
+                            "reason": "AUDIO Crash",
+                            "exception": e
                         })
-                        logger.warning(f"Audio parse failed for {filepath}")
+                        logger.error("AUDIO Crash: %s: %s", os.path.basename(filepath), e)
 
-                except Exception as e:
-                    stats['failed_aud'] += 1
-                    stats['errors'].append({
-                        "file": filepath, 
-                        "reason": f"AUDIO Crash: {str(e)}"
-                    })
-                    logger.error(f"AUDIO Crash: {os.path.basename(filepath)}: {e}")
 
+            # ==========================================
+            # 3. PROCESS GPS FILES
+            # ==========================================
+            gps_files = files_map['gps']
+            stats.total_gps += len(gps_files)
 
-        # ==========================================
-        # 3. PROCESS GPS FILES
-        # ==========================================
-        gps_files = files_map['gps']
-        stats['total_gps'] += len(gps_files)
-
-        if gps_files:
-            logger.info(f"Starting GPS Parser on {len(gps_files)} files...")
+            if gps_files:
+                logger.info("Starting GPS Parser on %d files...", len(gps_files))
             
-            # The parser handles the subfolder creation (gps/snapshots), 
-            # so we just pass the root processed folder.
-            for filepath in tqdm(gps_files, desc=f"GPS ({session_id})", unit="file"):
-                
-                # We pass 'processed_folder', logic inside parser adds 'gps/snapshots'
-                success = parse_gps_file(filepath, processed_folder)
+                # The parser handles the subfolder creation (gps/snapshots), 
+                # so we just pass the root processed folder.
+                # Files whose headers give the same snapshot name would race on one output path:
+                # only the first one (in file order) is converted, as in a sequential run,
+                # the others are skipped like an already existing snapshot
+                snapshot_names = gps_executor.map(gps_snapshot_name, gps_files)
+                claimed_names = set()
+                futures = []
+                for filepath, snapshot_name in zip(gps_files, snapshot_names):
+                    if snapshot_name is not None and snapshot_name in claimed_names:
+                        futures.append(None)
+                        continue
+                    claimed_names.add(snapshot_name)
+                    # Each worker writes its own snapshot, only the success flag comes back
+                    futures.append(gps_executor.submit(parse_gps_file, filepath, processed_folder))
+
+                for filepath, future in tqdm(zip(gps_files, futures), total=len(gps_files), desc=f"GPS ({session_id})", unit="file"):
+                    if future is None:
+                        logger.info("Skipping existing GPS file (duplicate snapshot name): %s", os.path.basename(filepath))
+                        success = False
+                    else:
+                        try:
+                            success = future.result()
+                        except Exception as e:
+                            logger.error("GPS Crash: %s: %s", os.path.basename(filepath), e)
+                            success = False
                 
-                if success:
-                    stats['success_gps'] += 1
-                else:
-                    stats['failed_gps'] += 1
-                    stats['errors'].append({
-                        "file": filepath, 
-                        "reason": "GPS Parser failed (Magic mismatch or empty)"
-                    })
+                    if success:
+                        stats.success_gps += 1
+                    else:
+                        stats.failed_gps += 1
+                        stats.errors.append({
+                            "file": filepath, 
+                            "reason": "GPS Parser failed (Magic mismatch or empty)"
+                        })
+
+    finally:
+        # Also on a crash: stop the workers (pending jobs are dropped) and the log forwarding
+        executor.shutdown(cancel_futures=True)
+        gps_executor.shutdown(cancel_futures=True)
+        log_listener.stop()
 
     # Final Report
-    stats["total"] = stats["total_imu"] + stats["total_aud"] + stats["total_gps"]
+    stats.total = stats.total_imu + stats.total_aud + stats.total_gps
     generate_summary(stats,logger,processed_folder)
 
 if __name__ == "__main__":
+    # Required for the process pool in the frozen (PyInstaller) Windows build
+    multiprocessing.freeze_support()
+
+    # Same logger object setup_logger() configures inside main()
+    app_logger = logging.getLogger(LOGGER_NAME)
+
     try:
-        # Run the App
-        main()
+        try:
+            # Run the App
+            main()
+
+        except Exception:
+            # Record the crash in the log file too (the troubleshooting log after a crash).
+            # File handlers only: the console shows the traceback on the crash screen below.
+            record = app_logger.makeRecord(app_logger.name, logging.ERROR, __file__, 0,
+                                           "CRITICAL ERROR - unhandled exception", None, sys.exc_info())
+            for handler in app_logger.handlers:
+                if not isinstance(handler, TqdmLoggingHandler):
+                    handler.handle(record)
+            raise
+
+        finally:
+            # Push any buffered log lines to the log file before the exit prompt
+            # (the user may just close the console window)
+            for handler in app_logger.handlers:
+                handler.flush()
         
         # Success State
         print("\n" + "="*60)
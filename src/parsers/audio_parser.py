@@ -1,11 +1,45 @@
+import mmap
 import numpy as np
-import os
-import logging
 import struct
-from datetime import datetime
-from src.core.binary_utils import read_vesper_header
+from src.core.binary_utils import parse_vesper_header_bytes
+from src.core.logger import logger
 
-logger = logging.getLogger("wildlifetag_automator")
+# --- CONSTANTS ---
+SAMPLE_RATE = 48000
+HEADER_SIZE = 142
+
+# Artifact Definition
+FOOTER_MAGIC = b'\xEF\xEF\xCD\xAB' # 0xABCDEFEF (Little Endian)
+FOOTER_MAGIC_U32 = struct.unpack('<I', FOOTER_MAGIC)[0]
+FOOTER_LEN = 14
+
+# Safety Margin (The "Kill Zone")
+# We remove 2 bytes (1 sample) before and 2 bytes after the footer to kill edge clicks.
+MARGIN_LEFT = 2
+MARGIN_RIGHT = 2
+
+# Lowercase hex digit for each nibble value (0-15)
+_HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+
+# "20YY-MM-DD HH:MM:SS": (output column of the high digit, index of the byte in the footer timestamp chunk)
+_TS_FIELDS = ((2, 7), (5, 5), (8, 6), (11, 0), (14, 1), (17, 2))
+
+def _format_footer_timestamps(ts_chunks):
+    """
+    Formats (N, 8) footer timestamp chunks as 'YYYY-MM-DD HH:MM:SS' strings.
+    Each byte is printed as two hex digits (BCD shown as-is, same as f"{b:02x}"),
+    written into a fixed-width character buffer for all footers at once.
+    """
+    out = np.empty((len(ts_chunks), 19), dtype=np.uint8)
+    out[:, 0:2] = np.frombuffer(b'20', dtype=np.uint8)
+    out[:, [4, 7]] = ord('-')
+    out[:, 10] = ord(' ')
+    out[:, [13, 16]] = ord(':')
+    for col, idx in _TS_FIELDS:
+        out[:, col] = _HEX_DIGITS[ts_chunks[:, idx] >> 4]
+        out[:, col + 1] = _HEX_DIGITS[ts_chunks[:, idx] & 0x0F]
+
+    return out.view('S19').ravel().astype(str).tolist()
 
 def parse_audio_file(filepath):
     """
@@ -71,93 +105,81 @@ def parse_audio_file(filepath):
     | 12-13   | FF 03       | Padding / Checksum            |
     ---------------------------------------------------------
     """
-    if not os.path.exists(filepath):
-        logger.error(f"File not found: {filepath}")
-        return False, None, None, []
-
-    # --- CONSTANTS ---
-    SAMPLE_RATE = 48000
-    HEADER_SIZE = 142
-    
-    # Artifact Definition
-    FOOTER_MAGIC = b'\xEF\xEF\xCD\xAB' # 0xABCDEFEF (Little Endian)
-    FOOTER_LEN = 14                    
-    
-    # Safety Margin (The "Kill Zone")
-    # We remove 2 bytes (1 sample) before and 2 bytes after the footer to kill edge clicks.
-    MARGIN_LEFT = 2
-    MARGIN_RIGHT = 2
-
-    timestamps = []
-
     try:
-        # Header Parsing
-        meta = read_vesper_header(filepath, header_size=HEADER_SIZE)
-        if not meta: return False, None, None, []
-        
-        # Read Raw File
-        with open(filepath, 'rb') as f:
-            f.seek(HEADER_SIZE)
-            raw_bytes = f.read()
-
-        clean_byte_stream = bytearray()
-        cursor = 0
-        file_len = len(raw_bytes)
-        
-        while cursor < file_len:
-            # Search for the next metadata footer
-            next_footer = raw_bytes.find(FOOTER_MAGIC, cursor)
-            
-            # If no footer found, append the rest of the file and finish
-            if next_footer == -1:
-                clean_byte_stream.extend(raw_bytes[cursor:])
-                break
-            
-            # --- EXTRACT TIMESTAMP (Validated against Hex Dump) ---
+        # Map the file instead of reading it: pages are loaded on demand by the OS and
+        # the payload is never copied into a Python bytes object.
+        # The header is decoded from the same map (one open for header and payload).
+        with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # Header Parsing
+            meta = parse_vesper_header_bytes(mapped[:HEADER_SIZE], filepath)
+
+            # The payload is scanned front to back: ask for aggressive readahead (Unix only, no-op on Windows)
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+            # View the payload as bytes in NumPy (no copy)
+            buf = np.frombuffer(mapped, dtype=np.uint8, offset=min(HEADER_SIZE, len(mapped)))
+            file_len = len(buf)
+
+            # --- LOCATE FOOTERS ---
+            # Vectorized search for the 4-byte magic at every offset: a stride-1 window
+            # reinterpreted as Little Endian uint32, so each offset is one integer compare
+            # (instead of four byte compares and three temporary masks)
+            if file_len >= 4:
+                windows = np.lib.stride_tricks.sliding_window_view(buf, 4).view('<u4')[:, 0]
+                candidates = np.flatnonzero(windows == FOOTER_MAGIC_U32)
+                del windows
+            else:
+                candidates = np.empty(0, dtype=np.intp)
+
+            # A footer swallows its own 14 bytes + right margin, so a match inside that zone
+            # (magic bytes occurring by chance in the audio) is not a footer.
+            # Only ~1 candidate per 64KB page, so this pass is cheap in Python.
+            footers = []
+            cursor = 0
+            for pos in candidates.tolist():
+                if pos >= cursor:
+                    footers.append(pos)
+                    cursor = pos + FOOTER_LEN + MARGIN_RIGHT
+            footers = np.asarray(footers, dtype=np.int64)
+
+            # --- EXTRACT TIMESTAMPS (Validated against Hex Dump) ---
             # Hex Sequence Example: 07 34 51 00 04 09 29 25
             # Time (Offsets 0-3): [07:HH] [34:MM] [51:SS] [00:Pad]
             # Date (Offsets 4-7): [04:Pad] [09:Mon] [29:Day] [25:Year]
-            try:
-                # We extract 8 bytes starting 4 bytes after the footer magic
-                ts_chunk = raw_bytes[next_footer+4 : next_footer+12]
-                
-                if len(ts_chunk) == 8:
-                    # Parse Time (Indices 0, 1, 2)
-                    hh = ts_chunk[0]
-                    mm = ts_chunk[1]
-                    ss = ts_chunk[2]
-                    
-                    # Parse Date (Indices 5, 6, 7)
-                    # Index 4 is padding (Value '04' in your image)
-                    mon = ts_chunk[5]  # 0x09 -> Month
-                    day = ts_chunk[6]  # 0x29 -> Day
-                    yy  = ts_chunk[7]  # 0x25 -> Year (2025)
-
-                    # Validation
-                    # Check if BCD/Hex values are within reasonable calendar ranges
-                    if 1 <= mon <= 0x12 and 1 <= day <= 0x31:
-                        # Use :02x to read bytes strictly as Hex digits
-                        ts_str = f"20{yy:02x}-{mon:02x}-{day:02x} {hh:02x}:{mm:02x}:{ss:02x}"
-                        timestamps.append(ts_str)
-            except Exception:
-                pass
+            # We extract 8 bytes starting 4 bytes after the footer magic (complete footers only)
+            complete = footers[footers + 12 <= file_len]
+            ts_chunks = buf[complete[:, None] + np.arange(4, 12)]
+
+            # Validation
+            # Check if BCD/Hex values are within reasonable calendar ranges
+            # (Index 4 is padding, 5 = Month, 6 = Day, 7 = Year)
+            mon, day = ts_chunks[:, 5], ts_chunks[:, 6]
+            valid = (mon >= 1) & (mon <= 0x12) & (day >= 1) & (day <= 0x31)
+            timestamps = _format_footer_timestamps(ts_chunks[valid])
 
             # --- CALCULATE CUTS ---
-            # Cut point Left: Footer Start - Margin
-            # We must ensure we don't cut before the current cursor (overlap check)
-            cut_start = max(cursor, next_footer - MARGIN_LEFT)
-            
-            # Append valid audio up to the cut point
-            clean_byte_stream.extend(raw_bytes[cursor : cut_start])
-            
-            # Advance Cursor: Skip Footer + Right Margin
-            cursor = next_footer + FOOTER_LEN + MARGIN_RIGHT
+            # Valid audio segments lie between the footers' "kill zones":
+            # segment i runs from the end of footer i-1 (+ right margin) to footer i (- left margin).
+            # Cut point Left never goes back past the segment start (overlap check).
+            starts = np.concatenate(([0], np.minimum(footers + FOOTER_LEN + MARGIN_RIGHT, file_len)))
+            ends = np.concatenate((np.maximum(starts[:-1], footers - MARGIN_LEFT), [file_len]))
+
+            # Stitch all segments together with a single copy (no bool mask, no growing buffer)
+            clean_bytes = np.concatenate([buf[start:end] for start, end in zip(starts.tolist(), ends.tolist())])
+
+            # The map can only be closed once no array views it anymore
+            del buf
 
         # Convert to Numpy Array (Signed 16-bit)
-        audio_data = np.frombuffer(clean_byte_stream, dtype='<i2')
-        
+        audio_data = clean_bytes.view('<i2')
+
         return True, meta, audio_data, timestamps
 
+    except FileNotFoundError:
+        logger.error(f"File not found: {filepath}")
+        return False, None, None, []
+
     except Exception as e:
         logger.error(f"Failed to parse audio {filepath}: {e}")
         return False, None, None, []
\ No newline at end of file
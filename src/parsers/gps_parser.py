@@ -1,9 +1,38 @@
+import mmap
 import os
 import struct
 import numpy as np
-import logging
+from src.core.fs_utils import ensure_dir
+from src.core.logger import logger
 
-logger = logging.getLogger("wildlifetag_automator")
+METADATA_HEADER_SIZE = 1024
+MAGIC_WORD = 0xA55AA55A
+
+def _snapshot_filename(header_bytes):
+    """Builds the snapshot name from the header's time (Offsets 4-6) and date (Offsets 9-11) bytes."""
+    # Time: Hour, Min, Sec (Offsets 4,5,6)
+    h, m, s = header_bytes[4], header_bytes[5], header_bytes[6]
+    
+    # Date: Month, Day, Year (Offsets 9, 10, 11)
+    mon, day, yr = header_bytes[9], header_bytes[10], header_bytes[11]
+    full_year = 2000 + yr
+
+    return f"snap.{full_year}_{mon:02d}_{day:02d}_{h:02d}_{m:02d}_{s:02d}_GC0.dat"
+
+def gps_snapshot_name(filepath):
+    """
+    Returns the snapshot filename parse_gps_file would write for filepath,
+    or None if it is not a readable GPS file. Only the first 16 bytes are read.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            header_bytes = f.read(16)
+    except OSError:
+        return None
+
+    if len(header_bytes) < 16 or struct.unpack_from('<I', header_bytes)[0] != MAGIC_WORD:
+        return None
+    return _snapshot_filename(header_bytes)
 
 def parse_gps_file(filepath, output_root):
     """
@@ -11,13 +40,14 @@ def parse_gps_file(filepath, output_root):
     Optimized for memory usage and correct 'Word Swap' logic.
     """
 
-    METADATA_HEADER_SIZE = 1024
-    MAGIC_WORD = 0xA55AA55A
+    CHUNK_WORDS = 1 << 20         # 4 MiB of payload per swap/write step
+    WRITE_BUFFER_SIZE = 1 << 20
     
     if not os.path.exists(filepath):
         logger.error(f"GPS File not found: {filepath}")
         return False
 
+    tmp_path = None
     try:
         # --- HEADER PROCESSING ---
         with open(filepath, 'rb') as f:
@@ -33,48 +63,60 @@ def parse_gps_file(filepath, output_root):
                 logger.warning(f"Invalid Magic Word in {os.path.basename(filepath)}: {magic:X}")
                 return False
 
-            # Extract Timestamp (Bytes 4-12)
-            # Time: Hour, Min, Sec (Offsets 4,5,6)
-            h, m, s = header_bytes[4], header_bytes[5], header_bytes[6]
-            
-            # Date: Month, Day, Year (Offsets 9, 10, 11)
-            mon, day, yr = header_bytes[9], header_bytes[10], header_bytes[11]
-            full_year = 2000 + yr
-
-            # Construct Filename
-            filename = f"snap.{full_year}_{mon:02d}_{day:02d}_{h:02d}_{m:02d}_{s:02d}_GC0.dat"
+            # Extract Timestamp (Bytes 4-12) and Construct Filename
+            filename = _snapshot_filename(header_bytes)
 
-            # Create Output Directory (Automatic handling)
-            output_dir = os.path.join(output_root, "gps", "snapshots")
-            os.makedirs(output_dir, exist_ok=True)
+            # Create Output Directory (Automatic handling, once per run)
+            output_dir = ensure_dir(os.path.join(output_root, "gps", "snapshots"))
             output_path = os.path.join(output_dir, filename)
 
+            # Whole 32-bit words after the header
+            payload_words = max(os.fstat(f.fileno()).st_size - METADATA_HEADER_SIZE, 0) // 4
+
             # Skip if already exists (Idempotency - Saves time on re-runs)
+            # Decided before any payload work. Snapshots are only ever moved into place
+            # complete (see below), so an existing one is never a partial write.
             if os.path.exists(output_path):
                 logger.info(f"Skipping existing GPS file: {filename}")
                 return False
 
+            if payload_words == 0:
+                logger.warning(f"GPS file empty payload: {os.path.basename(filepath)}")
+                return False
+
+            # Map the file (reuses the open handle, no second open and no read copy)
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
         # --- PAYLOAD (EFFICIENT) PROCESSING  ---
-        # Read directly to Numpy (Fast I/O, skip header)
-        raw_data = np.fromfile(filepath, dtype='<u4', offset=METADATA_HEADER_SIZE)
-
-        if raw_data.size == 0:
-            logger.warning(f"GPS file empty payload: {os.path.basename(filepath)}")
-            return False
-
-        # --- Perform Word Swap (I/Q Swap) ---
-
-        # Shift High 16 bits to Low, and Low to High
-        # 0xAABBCCDD -> 0xCCDDAABB
-        swapped_data = (raw_data << 16) | (raw_data >> 16)
-        
-        # --- Save to disk ---
-        # Cast back to u4 to ensure strictly 32-bit output
-        swapped_data.astype('<u4').tofile(output_path)
-        
+        # Streamed in fixed chunks so peak memory is O(chunk), not O(file)
+        # Written to a temp file and swapped in, so a killed run never leaves a partial snapshot
+        tmp_path = output_path + ".tmp"
+        with mapped, open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as out:
+            for first_word in range(0, payload_words, CHUNK_WORDS):
+                count = min(CHUNK_WORDS, payload_words - first_word)
+
+                # View directly in Numpy (Fast I/O, skip header), as (low, high) 16-bit halves of each 32-bit word
+                halves = np.frombuffer(mapped, dtype='<u2', count=count * 2,
+                                       offset=METADATA_HEADER_SIZE + first_word * 4).reshape(-1, 2)
+
+                # --- Perform Word Swap (I/Q Swap) ---
+
+                # Swap the High and Low 16 bits of every word: reversing each (low, high) pair
+                # 0xAABBCCDD -> 0xCCDDAABB
+                # Single copy into the output layout (no shifted/OR'd temporaries)
+                swapped_data = np.ascontiguousarray(halves[:, ::-1])
+                del halves
+
+                # --- Save to disk ---
+                # Little Endian 16-bit halves in swapped order == the swapped 32-bit words
+                out.write(swapped_data)
+        os.replace(tmp_path, output_path)
+
         logger.info(f"Generated GPS Snapshot: {filename}")
         return True
 
     except Exception as e:
         logger.error(f"GPS Parse Fail {os.path.basename(filepath)}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
         return False
\ No newline at end of file
@@ -1,20 +1,40 @@
+import mmap
 import numpy as np
 import os
-import logging
-import pandas as pd
-from src.core.binary_utils import read_vesper_header
-
-logger = logging.getLogger("wildlifetag_automator")
+from src.core.binary_utils import parse_vesper_header_bytes
+from src.core.logger import logger
 
 # --- CONSTANTS & OFFSETS ---
 # The header is exactly 150 bytes long. 
 # Valid sensor data begins at absolute offset 150.
 HEADER_SIZE = 150 
 
-def parse_imu_file(filepath):
+# Map the 42-byte packet structure using NumPy dtypes.
+# Gyro, Acc and Mag are 9 consecutive float32s, kept as one (9,) field so all
+# sensor values of a packet come from a single field.
+IMU_PACKET_DTYPE = np.dtype([
+    ('vec',   '<f4', (9,)), # Bytes 0-35: Gyro X,Y,Z | Acc X,Y,Z | Mag X,Y,Z
+    ('time',  'V6'),        # Bytes 36-41
+])
+
+# Sensor column slices within 'vec'
+GYRO = slice(0, 3)
+ACC = slice(3, 6)
+MAG = slice(6, 9)
+
+# Float32 output columns, in CSV order (after Time, Minute, Second, Milisecond)
+VALUE_COLUMNS = [
+    'Acc X [mg]', 'Acc Y [mg]', 'Acc Z [mg]', 
+    'Gyro X [dps]', 'Gyro Y [dps]', 'Gyro Z [dps]', 
+    'Mag X [mGauss]', 'Mag Y [mGauss]', 'Mag Z [mGauss]', 
+    'Temperature [C]', 'Bar Pressure [hPa]'
+]
+
+def read_imu_packets(filepath):
     """
-    Parses Vesper IMU binary (.BIN).
-    Returns DataFrame matching the structure of 'MBN.csv' files.
+    Reads Vesper IMU binary (.BIN) without any pandas work.
+    Returns (raw_struct, meta): a structured array of packets (IMU_PACKET_DTYPE,
+    a read-only view on the memory-mapped file) and the header metadata.
     
     FILE STRUCTURE:
     ------------------------------------------------------------
@@ -38,94 +58,133 @@ def parse_imu_file(filepath):
     | 36-41   | 6 Bytes | Timestamp/Counter/Padding            |
     ------------------------------------------------------------
     """
-    if not os.path.exists(filepath):
-        logger.error(f"File not found: {filepath}")
-        return None, None
-
     try:
+        # Map the file instead of reading it into a temporary array: the header and the
+        # packets are both read straight from the OS page cache (one open per file).
+        # The map is released once raw_struct (its only user) goes out of scope.
+        with open(filepath, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
         # --- PART 1: HEADER PARSING ---
-        meta = read_vesper_header(filepath, header_size=HEADER_SIZE)
-        if not meta: 
-            return None, None
+        meta = parse_vesper_header_bytes(mapped[:HEADER_SIZE], filepath)
 
         # --- PART 2: PARSE DATA PAYLOAD ---
-        # Map the 42-byte packet structure using NumPy dtypes.
-        dt = np.dtype([
-            ('gyro',  '<f4', (3,)), # Bytes 0-11
-            ('acc',   '<f4', (3,)), # Bytes 12-23
-            ('mag',   '<f4', (3,)), # Bytes 24-35
-            ('time',  'V6'),        # Bytes 36-41
-        ])
+        dt = IMU_PACKET_DTYPE
 
-        with open(filepath, 'rb') as f:
-            f.seek(HEADER_SIZE)
-            raw_struct = np.fromfile(f, dtype=dt)
-
-        num_samples = len(raw_struct)
+        # Whole packets only (a truncated last packet is ignored, as np.fromfile did)
+        num_samples = max(len(mapped) - HEADER_SIZE, 0) // dt.itemsize
         if num_samples == 0:
+            mapped.close()
             return None, None
 
-        # Extract sensor columns
-        acc_data = raw_struct['acc']
-        gyro_data = raw_struct['gyro']
-        mag_data = raw_struct['mag']
-
-        # --- PART 3: VECTORIZED TIME CALCULATION ---
-        # Calculate precise Datetime objects for every row based on SampleRate
-        period = 1.0 / meta['SampleRate']
-        time_deltas = pd.to_timedelta(np.arange(num_samples) * period, unit='s')
-        timestamps = meta["Start_Time"] + time_deltas
-
-        # --- PART 4: EXTRACT LEGACY COMPONENTS ---
-        # Matches the 'Minute', 'Second', 'Milisecond' columns from your CSV
-        minutes = timestamps.minute.astype('int8')
-        seconds = timestamps.second.astype('int8')
-        
-        # Calculate Milliseconds (Note: spelling 'Milisecond' to match CSV)
-        # Using actual values (0-999) instead of hardcoded 0
-        millis = (timestamps.microsecond // 1000).astype('int16')
-
-        # --- PART 5: CREATE DATAFRAME ---
-        data = {
-            # 1. Time Column (First, as per CSV)
-            'Time': timestamps,
-
-            # 2. Legacy Time Components
-            'Minute': minutes,
-            'Second': seconds,
-            'Milisecond': millis, # Sic: matches CSV header spelling
-
-            # 3. Sensor Data
-            'Acc X [mg]': acc_data[:, 0],
-            'Acc Y [mg]': acc_data[:, 1],
-            'Acc Z [mg]': acc_data[:, 2],
-            'Gyro X [dps]': gyro_data[:, 0],
-            'Gyro Y [dps]': gyro_data[:, 1],
-            'Gyro Z [dps]': gyro_data[:, 2],
-            'Mag X [mGauss]': mag_data[:, 0],
-            'Mag Y [mGauss]': mag_data[:, 1],
-            'Mag Z [mGauss]': mag_data[:, 2],
-            
-            # 4. Empty Placeholders (to match CSV format)
-            'Temperature [C]': 0.0,
-            'Bar Pressure [hPa]': 0.0
-        }
-
-        df = pd.DataFrame(data)
-        
-        # Ensure column order matches the provided CSV exactly
-        cols_order = [
-            'Time', 'Minute', 'Second', 'Milisecond', 
-            'Acc X [mg]', 'Acc Y [mg]', 'Acc Z [mg]', 
-            'Gyro X [dps]', 'Gyro Y [dps]', 'Gyro Z [dps]', 
-            'Mag X [mGauss]', 'Mag Y [mGauss]', 'Mag Z [mGauss]', 
-            'Temperature [C]', 'Bar Pressure [hPa]'
-        ]
-        
-        # Reorder just in case dict insertion order varied
-        df = df[cols_order]
-        
-        return df, meta
+        raw_struct = np.frombuffer(mapped, dtype=dt, count=num_samples, offset=HEADER_SIZE)
+        return raw_struct, meta
+
+    except FileNotFoundError:
+        logger.error(f"File not found: {filepath}")
+        return None, None
+
+    except Exception as e:
+        logger.error(f"Failed parsing {os.path.basename(filepath)}: {e}")
+        return None, None
+
+def imu_to_dataframe(raw_struct, meta):
+    """
+    Builds the output DataFrame (matching the structure of 'MBN.csv' files)
+    from the packets returned by read_imu_packets.
+    """
+    num_samples = len(raw_struct)
+
+    # Extract sensor columns
+    vec = raw_struct['vec']
+    acc_data = vec[:, ACC]
+    gyro_data = vec[:, GYRO]
+    mag_data = vec[:, MAG]
+
+    # pandas is imported here, not at module level: it is slow to import and
+    # only needed once there is IMU data (audio/GPS-only runs never load it)
+    import pandas as pd
+
+    # --- PART 3: VECTORIZED TIME CALCULATION ---
+    # Calculate precise Datetime objects for every row based on SampleRate
+    # (integer nanosecond arithmetic in NumPy, no float -> Timedelta conversion)
+    # Offsets are rounded per sample (i * 1e9 / rate), so non-integer periods (e.g. 30 Hz) don't drift
+    sample_rate = int(meta['SampleRate'])
+    if sample_rate <= 0:
+        raise ValueError(f"Invalid SampleRate: {sample_rate}")
+    offsets_ns = (np.arange(num_samples, dtype='i8') * 1_000_000_000 + sample_rate // 2) // sample_rate
+    timestamps = np.datetime64(meta["Start_Time"], 'ns') + offsets_ns.view('m8[ns]')
+
+    # --- PART 4: EXTRACT LEGACY COMPONENTS ---
+    # Matches the 'Minute', 'Second', 'Milisecond' columns from your CSV
+    # Derived straight from the nanoseconds since epoch (no datetime accessor round-trip)
+    epoch_ns = timestamps.view('i8')
+    minutes = (epoch_ns // 60_000_000_000 % 60).astype('int8')
+    seconds = (epoch_ns // 1_000_000_000 % 60).astype('int8')
+    
+    # Calculate Milliseconds (Note: spelling 'Milisecond' to match CSV)
+    # Using actual values (0-999) instead of hardcoded 0
+    millis = (epoch_ns // 1_000_000 % 1000).astype('int16')
+
+    # --- PART 5: CREATE DATAFRAME ---
+    # All 11 float32 value columns are written into one (N, 11) block that the
+    # DataFrame wraps without copying (a single consolidated float32 block)
+    values = np.zeros((num_samples, len(VALUE_COLUMNS)), dtype=np.float32)
+
+    # 3. Sensor Data (kept as float32, as stored in the file)
+    values[:, 0:3] = acc_data
+    values[:, 3:6] = gyro_data
+    values[:, 6:9] = mag_data
+
+    # 4. Empty Placeholders (to match CSV format): columns 9-10 stay zero
+
+    df = pd.DataFrame(values, columns=VALUE_COLUMNS, copy=False)
+
+    # 1. Time Column (First, as per CSV) and 2. Legacy Time Components
+    # Inserted in front, so the column order matches the provided CSV exactly
+    df.insert(0, 'Time', timestamps)
+    df.insert(1, 'Minute', minutes)
+    df.insert(2, 'Second', seconds)
+    df.insert(3, 'Milisecond', millis) # Sic: matches CSV header spelling
+    
+    return df
+
+def read_imu_time_range(filepath):
+    """
+    Returns (first, last) sample timestamps (numpy datetime64[ns]) of an IMU file,
+    computed from its header and size only (same arithmetic as imu_to_dataframe).
+    Returns None if the file is unreadable or holds no samples.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            header = f.read(HEADER_SIZE)
+            file_size = os.fstat(f.fileno()).st_size
+        if len(header) < HEADER_SIZE:
+            return None
+        meta = parse_vesper_header_bytes(header, filepath)
+    except Exception:
+        return None
+
+    num_samples = (file_size - HEADER_SIZE) // IMU_PACKET_DTYPE.itemsize
+    sample_rate = int(meta['SampleRate'])
+    if num_samples <= 0 or sample_rate <= 0:
+        return None
+
+    first = np.datetime64(meta["Start_Time"], 'ns')
+    last = first + np.timedelta64(((num_samples - 1) * 1_000_000_000 + sample_rate // 2) // sample_rate, 'ns')
+    return first, last
+
+def parse_imu_file(filepath):
+    """
+    Parses Vesper IMU binary (.BIN).
+    Returns (DataFrame, meta), the DataFrame matching the structure of 'MBN.csv' files.
+    """
+    raw_struct, meta = read_imu_packets(filepath)
+    if raw_struct is None:
+        return None, None
+
+    try:
+        return imu_to_dataframe(raw_struct, meta), meta
 
     except Exception as e:
         logger.error(f"Failed parsing {os.path.basename(filepath)}: {e}")
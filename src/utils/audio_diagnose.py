@@ -18,6 +18,24 @@ import numpy as np
 import os
 import sys
 
+# Printable ASCII (32-126) maps to itself, every other byte to '.'
+_PRINTABLE = bytes(b if 32 <= b <= 126 else ord('.') for b in range(256))
+
+def find_jumps(audio_samples, threshold, tile=1 << 20):
+    """
+    Returns the indices i where |sample[i+1] - sample[i]| > threshold (same as on np.diff).
+    The file is scanned in tiles of `tile` samples, so the int32 upcast and the
+    derivative stay small (cache-sized) instead of two full-length arrays.
+    """
+    hits = [np.empty(0, dtype=np.intp)]
+    for start in range(0, len(audio_samples) - 1, tile):
+        # One sample of overlap so the jump across the tile boundary is kept
+        chunk = audio_samples[start:start + tile + 1].astype(np.int32)
+        diffs = np.diff(chunk)
+        hits.append(np.flatnonzero(np.abs(diffs) > threshold) + start)
+
+    return np.concatenate(hits)
+
 def analyze_audio(filepath, header_size=150, threshold=15000, context_bytes=24, show_count=6):
     """
     Analyzes a raw binary audio file for discontinuities and periodic artifacts.
@@ -27,45 +45,46 @@ def analyze_audio(filepath, header_size=150, threshold=15000, context_bytes=24,
         return
 
     filename = os.path.basename(filepath)
+    file_size = os.path.getsize(filepath)
     print(f"\n{'='*20} DIAGNOSTIC REPORT: {filename} {'='*20}")
-    print(f"File Size:   {os.path.getsize(filepath):,} bytes")
+    print(f"File Size:   {file_size:,} bytes")
     print(f"Header Skip: {header_size} bytes")
     print(f"Threshold:   {threshold} (amplitude jump)")
     print("-" * 60)
 
     try:
         # 1. Load Data
-        with open(filepath, 'rb') as f:
-            # Read full raw bytes for Hex Context later
-            full_raw_bytes = f.read()
+        # Map the file instead of reading it into RAM: the OS pages it in on demand,
+        # and the Hex Context later reads through the same mapping
+        # (an empty file cannot be mapped)
+        full_raw_bytes = np.memmap(filepath, dtype=np.uint8, mode='r') if file_size else np.empty(0, dtype=np.uint8)
 
         # Isolate Payload (Skip Header)
         payload_bytes = full_raw_bytes[header_size:]
         
-        # Interpret as Signed 16-bit PCM (Little Endian)
-        # Using frombuffer is much faster than fromfile for memory objects
-        audio_samples = np.frombuffer(payload_bytes, dtype='<i2')
+        # Interpret as Signed 16-bit PCM (Little Endian), a view on the mapping (no copy)
+        audio_samples = payload_bytes.view('<i2')
         
         print(f"Total Samples: {len(audio_samples):,}")
         print(f"Duration:      {len(audio_samples) / 48000:.2f} seconds (assuming 48kHz)")
         
         # 2. Detect Discontinuities (Derivative)
-        # Calculate the difference between adjacent samples
-        diffs = np.diff(audio_samples.astype(np.int32))
-        
-        # Find raw indices where the jump is massive (larger than threshold)
-        raw_indices = np.where(np.abs(diffs) > threshold)[0]
+        # Calculate the difference between adjacent samples and
+        # find raw indices where the jump is massive (larger than threshold)
+        raw_indices = find_jumps(audio_samples, threshold)
         
         # --- DEBOUNCE LOGIC ---
         # The detector often triggers twice on one artifact (Entry & Exit).
         # We group clicks that happen within 100 samples of each other.
+        # raw_indices is sorted, so the next event is found by binary search: one step
+        # per distinct event instead of one per raw jump.
         click_indices = []
-        if len(raw_indices) > 0:
-            click_indices.append(raw_indices[0])
-            for idx in raw_indices[1:]:
-                # If this click is more than 100 samples away from the last one, it's a new event
-                if idx - click_indices[-1] > 100:
-                    click_indices.append(idx)
+        pos = 0
+        while pos < len(raw_indices):
+            idx = raw_indices[pos]
+            click_indices.append(idx)
+            # Skip to the first jump more than 100 samples away from this one, it's a new event
+            pos = int(np.searchsorted(raw_indices, idx + 100, side='right'))
         
         print(f"\n[1] ARTIFACT DETECTION")
         print(f"    Found {len(click_indices)} distinct events (Filtered from {len(raw_indices)} raw jumps).")
@@ -95,11 +114,17 @@ def analyze_audio(filepath, header_size=150, threshold=15000, context_bytes=24,
         if len(distances) > 0:
             avg_dist = np.mean(distances)
             print(f"\n    -> Average Distance: {avg_dist:.1f} bytes")
+
+            # The diagnosis uses every interval in the file, not just the ones shown:
+            # the median ignores isolated extra/missed events and follows jitter
+            all_distances = np.diff(click_indices) * 2
+            period_bytes = np.median(all_distances)
+            print(f"    -> Median Distance:  {period_bytes:.1f} bytes (all {len(all_distances)} intervals)")
             
             # Check for common "SD card" page sizes
-            if 65500 < avg_dist < 65600:
+            if 65500 < period_bytes < 65600:
                  print("    🚨 DIAGNOSIS: Confirmed 64KB (65536 byte) Page Artifacts.")
-            elif 131000 < avg_dist < 132000:
+            elif 131000 < period_bytes < 132000:
                 print("    🚨 DIAGNOSIS: Strong indicator of 128KB Block Artifacts.")
 
         # 4. Hex Inspection (The "Smoking Gun")
@@ -116,7 +141,8 @@ def analyze_audio(filepath, header_size=150, threshold=15000, context_bytes=24,
             start_b = max(0, abs_byte_offset - context_bytes)
             end_b = min(len(full_raw_bytes), abs_byte_offset + context_bytes)
             
-            snippet = full_raw_bytes[start_b:end_b]
+            # Only these few bytes are ever copied out of the mapping
+            snippet = bytes(full_raw_bytes[start_b:end_b])
             
             print(f"\n    Event #{i+1} at Absolute Byte {abs_byte_offset}:")
             
@@ -134,7 +160,7 @@ def analyze_audio(filepath, header_size=150, threshold=15000, context_bytes=24,
             
             # ASCII Decode (to see if 'IMU' or 'M' or timestamps appear)
             try:
-                ascii_repr = "".join([chr(b) if 32 <= b <= 126 else '.' for b in snippet])
+                ascii_repr = snippet.translate(_PRINTABLE).decode('ascii')
                 print(f"    TXT: {ascii_repr}")
             except:
                 pass
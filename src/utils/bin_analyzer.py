@@ -42,10 +42,17 @@ import argparse
 HEADER_SIZE = 150
 # Size of one data row (Gyro + Acc + Mag + Time)
 PACKET_SIZE = 42
+# Fixed header fields (Offsets 0-59), decoded in a single call:
+# Magic (4s), DeviceID (I), Sensor Name (16s), SampleRate (I @28), Bitmask (I @40), Config0-3 (I)
+_HDR = struct.Struct('<4sI16s4xI8xI4I')
+# One data row: Gyro X,Y,Z | Acc X,Y,Z | Mag X,Y,Z (Float32) + Time (6 Bytes), compiled once
+_PKT = struct.Struct('<9f6s')
 
-def _bcd_to_int(byte_val):
-    """Helper to convert BCD byte to integer."""
-    return (byte_val // 16) * 10 + (byte_val % 16)
+# BCD lookup table: _BCD_LUT[byte] == (high nibble * 10) + low nibble
+_BCD_LUT = bytes((b >> 4) * 10 + (b & 0x0F) for b in range(256))
+
+# Printable ASCII (32-126) maps to itself, every other byte to '.'
+_PRINTABLE = bytes(b if 32 <= b <= 126 else ord('.') for b in range(256))
 
 def print_header_info(filepath):
     """Decodes standard metadata and the hidden BCD timestamp."""
@@ -58,33 +65,24 @@ def print_header_info(filepath):
         print(f"Error reading file: {e}")
         return
     
-    # 1. Magic & ID
-    magic = header[0:4].hex().upper()
-    device_id = struct.unpack('<I', header[4:8])[0]
+    # 1-2. Magic, ID, Name & Configs (one unpack for all fixed fields)
+    (magic_raw, device_id, name_raw, sample_rate, bitmask,
+     config0, config1, config2, config3) = _HDR.unpack_from(header)
+    magic = magic_raw.hex().upper()
     
     try:
         # Extract ASCII name, strip null bytes
-        name = header[8:24].split(b'\x00')[0].decode('ascii')
+        name = name_raw.split(b'\x00')[0].decode('ascii')
     except: 
         name = "Unknown"
         
-    # 2. Configs
-    sample_rate = struct.unpack('<I', header[28:32])[0]
-    bitmask = struct.unpack('<I', header[40:44])[0]
-    config0 = struct.unpack('<I', header[44:48])[0]
-    config1 = struct.unpack('<I', header[48:52])[0]
-    config2 = struct.unpack('<I', header[52:56])[0]
-    config3 = struct.unpack('<I', header[56:60])[0]
     # 3. BCD Timestamp (Located at offsets 132-139)
     try:
-        h = _bcd_to_int(header[132])
-        m = _bcd_to_int(header[133])
-        s = _bcd_to_int(header[134])
-        
+        # Time: Hour(132), Min(133), Sec(134), Pad(135)
         # Date: Pad(136), Month(137), Day(138), Year(139)
-        mo = _bcd_to_int(header[137])
-        da = _bcd_to_int(header[138])
-        yr = 2000 + _bcd_to_int(header[139]) # Sensor stores year as '25'
+        # All 8 bytes decoded at once through the lookup table
+        h, m, s, _, _, mo, da, yr = header[132:140].translate(_BCD_LUT)
+        yr += 2000 # Sensor stores year as '25'
         
         ts_str = f"{da:02d}.{mo:02d}.{yr} {h:02d}:{m:02d}:{s:02d}"
     except Exception:
@@ -113,9 +111,9 @@ def hex_inspector(filepath, limit=200):
         
     for i in range(0, len(data), 16):
         chunk = data[i:i+16]
-        hex_str = " ".join(f"{b:02X}" for b in chunk)
+        hex_str = chunk.hex(' ').upper()
         # Replace non-printable chars with '.'
-        ascii_str = "".join(chr(b) if 32 <= b <= 126 else "." for b in chunk)
+        ascii_str = chunk.translate(_PRINTABLE).decode('ascii')
         
         print(f"{i:<8} | {hex_str:<48} | {ascii_str}")
         
@@ -129,27 +127,30 @@ def check_packet_alignment(filepath):
     
     with open(filepath, 'rb') as f:
         f.seek(HEADER_SIZE)
+        # All packets in one read
+        data = f.read(3 * PACKET_SIZE)
+        
+    for i in range(3):
+        offset = i * PACKET_SIZE
+        if len(data) - offset < PACKET_SIZE: 
+            print("End of file reached.")
+            break
         
-        for i in range(3):
-            raw = f.read(PACKET_SIZE)
-            if len(raw) < PACKET_SIZE: 
-                print("End of file reached.")
-                break
+        # Unpack Float32s (Gyro, Acc, Mag)
+        # Structure: Gyro(12) + Acc(12) + Mag(12) + Time(6)
+        try:
+            values = _PKT.unpack_from(data, offset)
+            gyro = values[0:3]
+            acc = values[3:6]
+            mag = values[6:9]
             
-            # Unpack Float32s (Gyro, Acc, Mag)
-            # Structure: Gyro(12) + Acc(12) + Mag(12) + Time(6)
-            try:
-                gyro = struct.unpack('<3f', raw[0:12])
-                acc = struct.unpack('<3f', raw[12:24])
-                mag = struct.unpack('<3f', raw[24:36])
-                
-                print(f"Packet {i}:")
-                print(f"  Gyro (dps):    X={gyro[0]:>10.2f}, Y={gyro[1]:>10.2f}, Z={gyro[2]:>10.2f}")
-                print(f"  Acc  (mg):     X={acc[0]:>10.2f},  Y={acc[1]:>10.2f},  Z={acc[2]:>10.2f}")
-                print(f"  Mag  (mGauss): X={mag[0]:>10.2f},  Y={mag[1]:>10.2f},  Z={mag[2]:>10.2f}")
-                print("-" * 50)
-            except Exception as e:
-                print(f"Error parsing packet {i}: {e}")
+            print(f"Packet {i}:")
+            print(f"  Gyro (dps):    X={gyro[0]:>10.2f}, Y={gyro[1]:>10.2f}, Z={gyro[2]:>10.2f}")
+            print(f"  Acc  (mg):     X={acc[0]:>10.2f},  Y={acc[1]:>10.2f},  Z={acc[2]:>10.2f}")
+            print(f"  Mag  (mGauss): X={mag[0]:>10.2f},  Y={mag[1]:>10.2f},  Z={mag[2]:>10.2f}")
+            print("-" * 50)
+        except Exception as e:
+            print(f"Error parsing packet {i}: {e}")
 
 def main():
     parser = argparse.ArgumentParser(description="IMU Binary Format Inspector")